@@ -0,0 +1,216 @@
+"""Local stand-ins for TikTok and the Telegram Bot API, used by run_bench.py.
+
+Both servers run in background threads so their own work does not show up as
+event-loop lag in the bot under test.
+
+FakeTikTok serves:
+  GET /api/item/<id>     canned item metadata (what yt-dlp would extract)
+  GET /media/<id>.mp4    canned media bytes
+  GET /thumb/<id>.jpg    canned thumbnail bytes
+with configurable latency, error rate and 429 rate.
+
+FakeTelegram answers the Bot API methods bot.py uses (getMe, sendMessage,
+sendVideo, sendPhoto, sendMediaGroup, deleteMessage, editMessageText, ...) and reports every
+call to a callback so the benchmark can measure end-to-end latency.
+"""
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import yt_dlp
+
+# Set by FakeTikTok.start(); read by fake_extract, which runs in the bot's download pool
+_TIKTOK_BASE = None
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Service:
+    """An HTTP server on 127.0.0.1 running in a daemon thread."""
+
+    def __init__(self, handler):
+        self._server = _QuietServer(('127.0.0.1', 0), handler)
+        self._server.service = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _TikTokHandler(_Handler):
+    def do_GET(self):
+        svc = self.server.service
+        m = re.match(r'^/api/item/(\d+)$', self.path)
+        if m:
+            time.sleep(svc.page_latency)
+            roll = svc.rng.random()
+            if roll < svc.rate_limit_rate:
+                return self._send(429, b'{"statusCode": 10000}')
+            if roll < svc.rate_limit_rate + svc.error_rate:
+                return self._send(404, b'{"statusCode": 10204}')
+            return self._send(200, json.dumps(svc.item(m.group(1))).encode('utf-8'))
+        if re.match(r'^/media/\d+\.mp4$', self.path):
+            time.sleep(svc.cdn_latency)
+            return self._send(200, svc.media, 'video/mp4')
+        if re.match(r'^/thumb/\d+\.jpg$', self.path):
+            time.sleep(svc.cdn_latency)
+            return self._send(200, svc.thumb, 'image/jpeg')
+        self._send(404, b'{}')
+
+
+class FakeTikTok(_Service):
+    """Fake TikTok page/API and CDN."""
+
+    def __init__(self, page_latency=0.2, cdn_latency=0.05, error_rate=0.0, rate_limit_rate=0.0, media_kb=512, seed=0):
+        super().__init__(_TikTokHandler)
+        self.page_latency = page_latency
+        self.cdn_latency = cdn_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.media = bytes(media_kb * 1024)
+        self.thumb = bytes(4 * 1024)
+        self.rng = random.Random(seed)
+
+    def start(self):
+        global _TIKTOK_BASE
+        _TIKTOK_BASE = self.base_url
+        return super().start()
+
+    def item(self, video_id):
+        return {
+            'id': video_id,
+            'title': f'bench video {video_id}',
+            'uploader': 'bench',
+            'duration': 15,
+            'extractor': 'TikTok',
+            'extractor_key': 'TikTok',
+            'webpage_url': f'https://www.tiktok.com/@bench/video/{video_id}',
+            'thumbnail': f'{self.base_url}/thumb/{video_id}.jpg',
+            'formats': [{
+                'format_id': 'h264_540p',
+                'url': f'{self.base_url}/media/{video_id}.mp4',
+                'ext': 'mp4',
+                'vcodec': 'h264',
+                'acodec': 'aac',
+                'height': 540,
+                'filesize': len(self.media),
+            }],
+        }
+
+
+def fake_extract(ydl_opts, url):
+    """Drop-in for bot._ytdl_extract that reads metadata from FakeTikTok.
+
+    HTTP errors are raised as yt-dlp DownloadErrors with the same text yt-dlp
+    uses, so bot._error_kind classifies them as it would in production.
+    """
+    video_id = re.search(r'/video/(\d+)', url).group(1)
+    try:
+        with urllib.request.urlopen(f'{_TIKTOK_BASE}/api/item/{video_id}', timeout=30) as resp:
+            raw = json.load(resp)
+    except urllib.error.HTTPError as e:
+        raise yt_dlp.utils.DownloadError(f'ERROR: [TikTok] {video_id}: HTTP Error {e.code}: {e.reason}')
+    with yt_dlp.YoutubeDL(dict(ydl_opts, quiet=True, noprogress=True)) as ydl:
+        return ydl.sanitize_info(ydl.process_ie_result(raw, download=False))
+
+
+def _parse_params(body, content_type):
+    """Return the text fields of a urlencoded or multipart Bot API request."""
+    if content_type.startswith('multipart/form-data'):
+        boundary = content_type.split('boundary=', 1)[1].strip('"').encode('latin-1')
+        params = {}
+        for part in body.split(b'--' + boundary):
+            head, sep, value = part.partition(b'\r\n\r\n')
+            m = re.search(rb'name="([^"]+)"', head)
+            if not sep or not m or b'filename=' in head:
+                continue
+            params[m.group(1).decode()] = value.rstrip(b'\r\n').decode('utf-8', 'replace')
+        return params
+    if content_type.startswith('application/json'):
+        return {k: v if isinstance(v, str) else json.dumps(v) for k, v in json.loads(body or b'{}').items()}
+    return {k: v[0] for k, v in parse_qs(body.decode('utf-8'), keep_blank_values=True).items()}
+
+
+class _TelegramHandler(_Handler):
+    def do_POST(self):
+        svc = self.server.service
+        m = re.match(r'^/bot[^/]+/(\w+)$', self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if not m:
+            return self._send(404, b'{"ok": false, "error_code": 404, "description": "Not Found"}')
+        method = m.group(1)
+        params = _parse_params(body, self.headers.get('Content-Type', ''))
+        if method in ('sendVideo', 'sendPhoto', 'sendDocument', 'sendMediaGroup'):
+            time.sleep(svc.upload_latency)
+        result = svc.result(method, params)
+        svc.on_call(method, params, time.monotonic())
+        self._send(200, json.dumps({'ok': True, 'result': result}).encode('utf-8'))
+
+    do_GET = do_POST
+
+
+class FakeTelegram(_Service):
+    """Fake Telegram Bot API. ``on_call(method, params, monotonic_time)`` sees every call."""
+
+    def __init__(self, on_call=lambda method, params, ts: None, upload_latency=0.05):
+        super().__init__(_TelegramHandler)
+        self.on_call = on_call
+        self.upload_latency = upload_latency
+        self._ids = itertools.count(1_000_000)
+
+    def result(self, method, params):
+        if method == 'getMe':
+            return {'id': 1, 'is_bot': True, 'first_name': 'bench', 'username': 'bench_bot',
+                    'can_join_groups': True, 'can_read_all_group_messages': False, 'supports_inline_queries': False}
+        if method == 'sendMediaGroup':
+            media = json.loads(params.get('media') or '[]')
+            return [self.result('sendPhoto' if m.get('type') == 'photo' else 'sendVideo', dict(params, video=m.get('media')))
+                    for m in media]
+        if method not in ('sendMessage', 'sendVideo', 'sendPhoto', 'editMessageText'):
+            return True
+        chat_id = int(params.get('chat_id', 0))
+        message_id = next(self._ids)
+        message = {'message_id': message_id, 'date': int(time.time()), 'chat': {'id': chat_id, 'type': 'private'}}
+        if method == 'sendVideo':
+            # Re-sends by file_id arrive as a text field; uploads arrive as a file part
+            file_id = params.get('video') or f'video-{message_id}'
+            message['video'] = {'file_id': file_id, 'file_unique_id': f'uv-{message_id}', 'width': 540, 'height': 960, 'duration': 15}
+        elif method == 'sendPhoto':
+            message['photo'] = [{'file_id': f'photo-{message_id}', 'file_unique_id': f'up-{message_id}', 'width': 540, 'height': 960}]
+        else:
+            message['text'] = params.get('text', '')
+        return message
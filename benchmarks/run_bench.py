@@ -0,0 +1,204 @@
+"""Load-test bot.py against local fake TikTok and Telegram servers.
+
+Usage (from the repository root):
+
+    python benchmarks/run_bench.py --rate 20 --requests 200
+    DOWNLOAD_WORKERS=8 python benchmarks/run_bench.py --rate 50 --requests 500 --unique-videos 50
+
+The bot is built with build_application() and pointed at the fake Bot API via
+TELEGRAM_API_BASE_URL. Metadata extraction goes to the fake TikTok server
+(bot._ytdl_extract is swapped for fake_services.fake_extract). Media downloads,
+thumbnails, uploads, caching, rate limiting and scheduling all run through the
+real bot code. Synthetic updates are fed into the application's update queue at
+--rate per second. Each one is a private chat with one TikTok URL, and it
+counts as done when its video (or an error message) reaches the fake Bot API.
+
+Any bot.py setting can be passed through the environment. The run happens in
+a temporary working directory, so downloads, caches and bot.log never touch
+the repository.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import fake_services  # noqa: E402
+
+# Messages the bot sends while it is still working on a URL
+_PROGRESS_PREFIXES = ('Downloading', 'Queued', 'Compressing')
+
+
+def _percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    k = max(0, min(len(values) - 1, int(round(pct / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+class _Tracker:
+    """Matches fake Bot API calls back to the synthetic update that caused them."""
+
+    def __init__(self):
+        self.sent_at = {}
+        self.done_at = {}
+        self.outcome = {}
+        self._lock = threading.Lock()
+
+    def on_call(self, method, params, ts):
+        try:
+            chat_id = int(params.get('chat_id', 0))
+        except ValueError:
+            return
+        if method in ('sendVideo', 'sendMediaGroup'):
+            outcome = 'video'
+        elif method == 'sendMessage' and not params.get('text', '').startswith(_PROGRESS_PREFIXES):
+            outcome = 'error'
+        else:
+            return
+        with self._lock:
+            if chat_id in self.sent_at and chat_id not in self.done_at:
+                self.done_at[chat_id] = ts
+                self.outcome[chat_id] = outcome
+
+
+async def _measure_loop_lag(samples, stop, interval=0.01):
+    """Record how late the event loop wakes up from a short sleep."""
+    while not stop.is_set():
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.monotonic() - started - interval))
+
+
+def _make_update(bot_module, app, index, chat_id, video_id):
+    from telegram import Update
+    data = {
+        'update_id': index,
+        'message': {
+            'message_id': index,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'bench'},
+            'text': f'https://www.tiktok.com/@bench/video/{video_id}',
+        },
+    }
+    return Update.de_json(data, app.bot)
+
+
+async def _run(args, tracker):
+    import bot
+    bot._ytdl_extract = fake_services.fake_extract
+    app = bot.build_application()
+
+    lag_samples = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_loop_lag(lag_samples, stop))
+
+    await app.initialize()
+    if app.post_init:
+        await app.post_init(app)
+    await app.start()
+
+    started = time.monotonic()
+    interval = 1.0 / args.rate
+    try:
+        for i in range(args.requests):
+            target = started + i * interval
+            delay = target - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            chat_id = 10_000 + i
+            video_id = 7_000_000_000 + (i % args.unique_videos if args.unique_videos else i)
+            tracker.sent_at[chat_id] = time.monotonic()
+            await app.update_queue.put(_make_update(bot, app, i + 1, chat_id, video_id))
+
+        deadline = time.monotonic() + args.drain_timeout
+        while len(tracker.done_at) < args.requests and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        finished = time.monotonic()
+    finally:
+        stop.set()
+        await lag_task
+        await app.stop()
+        await app.shutdown()
+        if app.post_shutdown:
+            await app.post_shutdown(app)
+
+    latencies = [tracker.done_at[c] - tracker.sent_at[c] for c in tracker.done_at]
+    completed = len(tracker.done_at)
+    elapsed = (max(tracker.done_at.values()) if tracker.done_at else finished) - started
+    return {
+        'requests': args.requests,
+        'completed': completed,
+        'videos': sum(1 for o in tracker.outcome.values() if o == 'video'),
+        'errors': sum(1 for o in tracker.outcome.values() if o == 'error'),
+        'timed_out': args.requests - completed,
+        'throughput_per_s': completed / elapsed if elapsed > 0 else float('nan'),
+        'latency_p50_s': _percentile(latencies, 50),
+        'latency_p99_s': _percentile(latencies, 99),
+        'latency_max_s': max(latencies) if latencies else float('nan'),
+        'loop_lag_p50_ms': _percentile(lag_samples, 50) * 1000,
+        'loop_lag_p99_ms': _percentile(lag_samples, 99) * 1000,
+        'loop_lag_max_ms': (max(lag_samples) if lag_samples else float('nan')) * 1000,
+        'loop_lag_mean_ms': (statistics.fmean(lag_samples) if lag_samples else float('nan')) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rate', type=float, default=10, help='synthetic updates per second')
+    parser.add_argument('--requests', type=int, default=100, help='number of updates to send')
+    parser.add_argument('--unique-videos', type=int, default=0,
+                        help='cycle through this many video IDs (0: every update is a new video)')
+    parser.add_argument('--page-latency', type=float, default=0.2, help='fake TikTok metadata latency (s)')
+    parser.add_argument('--cdn-latency', type=float, default=0.05, help='fake CDN latency (s)')
+    parser.add_argument('--upload-latency', type=float, default=0.05, help='fake Bot API upload latency (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of metadata requests answered 404')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='fraction of metadata requests answered 429')
+    parser.add_argument('--media-kb', type=int, default=512, help='size of the canned video (KiB)')
+    parser.add_argument('--drain-timeout', type=float, default=120, help='seconds to wait for stragglers')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    tracker = _Tracker()
+    tiktok = fake_services.FakeTikTok(
+        page_latency=args.page_latency, cdn_latency=args.cdn_latency, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, media_kb=args.media_kb, seed=args.seed,
+    ).start()
+    telegram = fake_services.FakeTelegram(on_call=tracker.on_call, upload_latency=args.upload_latency).start()
+
+    workdir = tempfile.mkdtemp(prefix='tiktok-bot-bench-')
+    os.chdir(workdir)
+    os.environ.setdefault('BOT_TOKEN', '123456:bench')
+    os.environ['TELEGRAM_API_BASE_URL'] = f'{telegram.base_url}/bot'
+    os.environ.setdefault('FILE_ID_CACHE_PATH', os.path.join(workdir, 'file_id_cache.json'))
+
+    try:
+        report = asyncio.run(_run(args, tracker))
+    finally:
+        tiktok.stop()
+        telegram.stop()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"requests    {report['requests']}  completed {report['completed']}  "
+          f"videos {report['videos']}  errors {report['errors']}  timed out {report['timed_out']}")
+    print(f"throughput  {report['throughput_per_s']:.2f} req/s")
+    print(f"latency     p50 {report['latency_p50_s']:.3f}s  p99 {report['latency_p99_s']:.3f}s  max {report['latency_max_s']:.3f}s")
+    print(f"loop lag    p50 {report['loop_lag_p50_ms']:.1f}ms  p99 {report['loop_lag_p99_ms']:.1f}ms  max {report['loop_lag_max_ms']:.1f}ms")
+    print(f"workdir     {workdir}")
+
+
+if __name__ == '__main__':
+    main()
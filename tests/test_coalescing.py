@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot  # noqa: E402
+
+VIDEO_ID = '7000000000000000001'
+URL = f'https://www.tiktok.com/@a/video/{VIDEO_ID}'
+
+
+class _FakeBot:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, chat_id, text):
+        self.messages.append((chat_id, text))
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(bot, '_file_id_cache', bot._FileIdCache(str(tmp_path / 'cache.json'), 3600, 100))
+
+
+def _run(waiters, download):
+    """Run ``waiters`` concurrent requests (chat IDs 1..N) for one video; return the results."""
+    async def main():
+        tasks = []
+        for chat_id, final_attempt in waiters:
+            tasks.append(asyncio.create_task(bot._process_resolved_url(fake_bot, chat_id, URL, VIDEO_ID, final_attempt)))
+            await asyncio.sleep(0)
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    fake_bot = _FakeBot()
+    bot._download_and_send, original = download, bot._download_and_send
+    try:
+        return asyncio.run(main()), fake_bot
+    finally:
+        bot._download_and_send = original
+
+
+def test_waiters_get_the_owners_failure_without_downloading():
+    calls = []
+
+    async def download(bot_, chat_id, url, final_attempt):
+        calls.append(chat_id)
+        await asyncio.sleep(0.05)
+        await bot._reply_failure(bot_, chat_id, 'The video was removed.')
+        return None
+
+    results, fake_bot = _run([(1, True), (2, True), (3, True)], download)
+    assert calls == [1]
+    assert results == [None, None, None]
+    assert sorted(fake_bot.messages) == [(1, 'The video was removed.'), (2, 'The video was removed.'), (3, 'The video was removed.')]
+    assert not bot._inflight
+
+
+def test_one_waiter_takes_over_when_the_owner_stops_without_an_answer():
+    calls = []
+
+    async def download(bot_, chat_id, url, final_attempt):
+        calls.append(chat_id)
+        await asyncio.sleep(0.05)
+        if len(calls) == 1:
+            raise RuntimeError('owner crashed')
+        await bot._reply_failure(bot_, chat_id, 'Failed.')
+        return None
+
+    results, fake_bot = _run([(1, True), (2, True), (3, True)], download)
+    assert isinstance(results[0], RuntimeError)
+    assert calls == [1, 2]  # waiter 3 waited on waiter 2 instead of downloading as well
+    assert sorted(fake_bot.messages) == [(2, 'Failed.'), (3, 'Failed.')]
+
+
+def test_transient_failure_is_retried_by_the_queue_or_taken_over_on_the_last_attempt():
+    calls = []
+
+    async def download(bot_, chat_id, url, final_attempt):
+        calls.append(chat_id)
+        await asyncio.sleep(0.05)
+        if not final_attempt:
+            raise bot.RetryableDownloadError('rate_limit')
+        await bot._reply_failure(bot_, chat_id, 'Rate limited.')
+        return None
+
+    results, fake_bot = _run([(1, False), (2, False), (3, True)], download)
+    assert isinstance(results[0], bot.RetryableDownloadError)
+    assert isinstance(results[1], bot.RetryableDownloadError)
+    assert results[2] is None
+    assert calls == [1, 3]
+    assert fake_bot.messages == [(3, 'Rate limited.')]
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot  # noqa: E402
+
+VID = '7340440412345678901'
+LOGIN_HINT = ('. Use --cookies-from-browser or --cookies for the authentication. See  '
+              'https://github.com/yt-dlp/yt-dlp/wiki/FAQ#how-do-i-pass-cookies-to-yt-dlp  '
+              'for how to manually pass cookies')
+
+
+@pytest.mark.parametrize('message, kind', [
+    (f'ERROR: [TikTok] {VID}: Unable to download webpage: HTTP Error 403: Forbidden '
+     '(caused by <HTTPError 403: Forbidden>)', 'geo'),
+    ('ERROR: [TikTok] Your IP address is blocked from accessing this post', 'geo'),
+    ('ERROR: This video is not available from your location due to geo restriction', 'geo'),
+    (f'ERROR: [TikTok] {VID}: Unable to download webpage: HTTP Error 404: Not Found '
+     '(caused by <HTTPError 404: Not Found>)', 'removed'),
+    (f'ERROR: [TikTok] {VID}: Unable to download webpage: HTTP Error 429: Too Many Requests '
+     '(caused by <HTTPError 429: Too Many Requests>)', 'rate_limit'),
+    (f'ERROR: [TikTok] {VID}: Unable to download webpage: The read operation timed out', 'timeout'),
+    ('ERROR: [TikTok] TikTok is requiring login for access to this content' + LOGIN_HINT, 'login'),
+    ('ERROR: [TikTok] You do not have permission to view this post. '
+     'Log into an account that has access' + LOGIN_HINT, 'login'),
+    ("ERROR: [tiktok:user] This user's account is private. Log into an account that has access"
+     + LOGIN_HINT, 'private'),
+    (f'ERROR: [TikTok] {VID}: Unable to extract universal data for rehydration', None),
+    (f'ERROR: [TikTok] {VID}: Video not available, status code 10204', None),
+])
+def test_error_kind_on_yt_dlp_messages(message, kind):
+    assert bot._error_kind(Exception(message)) == kind
+
+
+def test_forbidden_scores_proxy_and_login_scores_cookies():
+    assert 'geo' in bot._PROXY_FAILURE_KINDS and 'geo' not in bot._COOKIE_FAILURE_KINDS
+    assert 'login' in bot._COOKIE_FAILURE_KINDS and 'login' not in bot._PROXY_FAILURE_KINDS
+    assert 'removed' not in bot._PROXY_FAILURE_KINDS + bot._COOKIE_FAILURE_KINDS
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot  # noqa: E402
+
+
+def _entry(name):
+    return {'id': name, 'items': [{'type': 'video', 'file_id': f'file-{name}'}]}
+
+
+def _refresh(cache):
+    cache._checked_at = 0.0
+    asyncio.run(cache.refresh())
+
+
+def test_get_survives_refresh_and_evicts_least_recently_used(tmp_path):
+    cache = bot._FileIdCache(str(tmp_path / 'cache.json'), 3600, 2)
+    cache.put('a', _entry('a'))
+    cache.put('b', _entry('b'))
+    cache.get('a')
+    cache._save()
+    _refresh(cache)
+    assert list(cache._entries) == ['b', 'a']
+    cache.put('c', _entry('c'))
+    assert list(cache._entries) == ['a', 'c']
+
+
+def test_own_save_does_not_trigger_a_reload(tmp_path):
+    cache = bot._FileIdCache(str(tmp_path / 'cache.json'), 3600, 10)
+    cache.put('a', _entry('a'))
+    cache._save()
+    assert cache._mtime == cache._file_mtime()
+
+
+def test_processes_share_entries_and_recency(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    first = bot._FileIdCache(path, 3600, 2)
+    second = bot._FileIdCache(path, 3600, 2)
+    first.put('a', _entry('a'))
+    first._save()
+    second.put('b', _entry('b'))
+    second._save()
+    _refresh(first)
+    assert first.get('b')['items'][0]['file_id'] == 'file-b'
+    _refresh(second)
+    assert second.get('a') is not None
+    second._save()
+    # 'b' was used by first after 'a' was stored, but second used 'a' last
+    _refresh(first)
+    assert list(first._entries) == ['b', 'a']
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = bot._FileIdCache(str(tmp_path / 'cache.json'), 3600, 10)
+    cache.put('a', _entry('a'))
+    cache._entries['a'] = dict(cache._entries['a'], ts=0)
+    assert cache.get('a') is None
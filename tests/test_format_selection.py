@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot  # noqa: E402
+
+MB = 1024 * 1024
+LIMIT = 50 * MB
+
+
+def _fmt(format_id, size=None, vcodec='h264', acodec='aac', **extra):
+    f = {'format_id': format_id, 'vcodec': vcodec, 'acodec': acodec}
+    if size is not None:
+        f['filesize'] = size * MB
+    f.update(extra)
+    return f
+
+
+# Formats are listed worst to best, as yt-dlp sorts them
+@pytest.mark.parametrize('formats, expected', [
+    # Best progressive format that fits
+    ([_fmt('360p', 10), _fmt('720p', 40), _fmt('1080p', 80)], ('720p', True)),
+    # yt-dlp's order wins over size: the better format is picked even if smaller
+    ([_fmt('big_h265', 45), _fmt('small_h264', 30)], ('small_h264', True)),
+    # No progressive format fits: best video+audio pair that does
+    ([_fmt('prog', 90), _fmt('v480', 20, acodec='none'), _fmt('v1080', 60, acodec='none'),
+      _fmt('a64', 2, vcodec='none'), _fmt('a128', 4, vcodec='none')], ('v480+a128', True)),
+    # Sizes unknown: best progressive format, checked after download
+    ([_fmt('low'), _fmt('high')], ('high', True)),
+    # Some sizes unknown, nothing known fits: let yt-dlp filter by size
+    ([_fmt('v', 60, acodec='none'), _fmt('a', vcodec='none')],
+     (f'best[filesize<?{LIMIT}]/bestvideo[filesize<?{LIMIT}]+bestaudio/best', True)),
+    # Every format over the limit
+    ([_fmt('720p', 60), _fmt('1080p', 90), _fmt('v', 55, acodec='none'), _fmt('a', 6, vcodec='none')],
+     (None, False)),
+    # Sizes from bitrate and duration: 4000 kbps * 60 s = 30 MB fits, 8000 kbps does not
+    ([_fmt('low', tbr=4000), _fmt('high', tbr=8000)], ('low', True)),
+    # Watermarked (-2), unplayable (-100) and untested formats lose to a clean one
+    ([_fmt('clean', 10), _fmt('watermarked', 20, preference=-2), _fmt('bytevc2', 15, preference=-100),
+      _fmt('untested', 12, __needs_testing=True)], ('clean', True)),
+    # Only watermarked formats: better than nothing
+    ([_fmt('wm_low', 10, preference=-2), _fmt('wm_high', 20, preference=-2)], ('wm_high', True)),
+    # Only watermarked and unplayable: the unplayable one is never picked
+    ([_fmt('wm', 10, preference=-2), _fmt('bytevc2', 5, preference=-100)], ('wm', True)),
+])
+def test_select_format(formats, expected):
+    assert bot._select_format({'formats': formats, 'duration': 60}, LIMIT) == expected
+
+
+def test_select_format_without_format_list_keeps_default_selector():
+    assert bot._select_format({'entries': [{}]}, LIMIT) == (None, True)
+
+
+@pytest.mark.parametrize('formats, expected', [
+    ([_fmt('720p', 60), _fmt('1080p', 90), _fmt('v', 55, acodec='none')], '720p'),
+    ([_fmt('clean', 80), _fmt('wm', 60, preference=-2), _fmt('bytevc2', 40, preference=-100)], 'clean'),
+    ([_fmt('unknown')], None),
+])
+def test_smallest_format(formats, expected):
+    assert bot._smallest_format({'formats': formats, 'duration': 60}) == expected
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot  # noqa: E402
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(bot, 'QUEUE_MAX_ATTEMPTS', 3)
+    monkeypatch.setattr(bot, '_backoff_delay', lambda attempt: 60.0)
+    return bot._JobQueue(str(tmp_path / 'jobs.sqlite3'))
+
+
+def _row(queue, job_id):
+    with queue._connect() as conn:
+        return dict(conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+
+
+def test_claim_returns_jobs_in_enqueue_order(queue):
+    first = queue.enqueue(1, 'https://www.tiktok.com/@a/video/1', 10)
+    second = queue.enqueue(2, 'https://www.tiktok.com/@a/video/2')
+    job = queue.claim('w1', 60)
+    assert (job['id'], job['chat_id'], job['status_msg_id'], job['attempts']) == (first, 1, 10, 1)
+    assert queue.claim('w2', 60)['id'] == second
+    assert queue.claim('w3', 60) is None
+    assert queue.depth() == 0
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job_id = queue.enqueue(1, 'u')
+    queue.claim('dead', -1)  # the worker died; its lease is already over
+    job = queue.claim('w2', 60)
+    assert (job['id'], job['attempts']) == (job_id, 2)
+    # The old worker can neither renew nor complete a job it lost
+    assert not queue.heartbeat(job_id, 'dead', 60)
+    assert queue.heartbeat(job_id, 'w2', 60)
+    queue.complete(job_id, 'dead')
+    assert _row(queue, job_id)['status'] == 'running'
+    queue.complete(job_id, 'w2')
+    assert _row(queue, job_id)['status'] == 'done'
+
+
+def test_expired_lease_on_last_attempt_gives_up(queue):
+    job_id = queue.enqueue(1, 'u')
+    for _ in range(3):
+        assert queue.claim('dead', -1)['id'] == job_id
+    assert queue.claim('w', 60) is None
+    assert _row(queue, job_id)['status'] == 'failed'
+
+
+def test_fail_backs_off_then_gives_up(queue):
+    job_id = queue.enqueue(1, 'u')
+    job = queue.claim('w', 60)
+    queue.fail(job_id, 'w', job['attempts'], 'boom')
+    row = _row(queue, job_id)
+    assert row['status'] == 'pending' and row['last_error'] == 'boom'
+    assert row['available_at'] >= row['updated_at'] + 59
+    assert queue.claim('w', 60) is None  # not due yet
+    assert queue.depth() == 1
+
+    with queue._connect() as conn:
+        conn.execute('UPDATE jobs SET available_at = 0, attempts = 2 WHERE id = ?', (job_id,))
+    job = queue.claim('w', 60)
+    assert job['attempts'] == 3
+    queue.fail(job_id, 'w', job['attempts'], 'boom again')
+    assert _row(queue, job_id)['status'] == 'failed'
+    assert queue.depth() == 0
+
+
+def test_retryable_error_requeues_job_until_last_attempt(queue, monkeypatch):
+    calls = []
+
+    async def process_url(bot_, chat_id, url, final_attempt=False):
+        calls.append(final_attempt)
+        if not final_attempt:
+            raise bot.RetryableDownloadError('rate_limit')
+
+    async def delete_message(**kwargs):
+        pass
+
+    monkeypatch.setattr(bot, '_get_job_queue', lambda: queue)
+    monkeypatch.setattr(bot, '_process_url', process_url)
+    fake_bot = SimpleNamespace(delete_message=delete_message)
+    job_id = queue.enqueue(1, 'u', 5)
+
+    for attempt in range(1, 4):
+        with queue._connect() as conn:
+            conn.execute('UPDATE jobs SET available_at = 0 WHERE id = ?', (job_id,))
+        job = queue.claim('w', 60)
+        assert job['attempts'] == attempt
+        asyncio.run(bot._run_job(fake_bot, job, 'w'))
+        assert _row(queue, job_id)['status'] == ('done' if attempt == 3 else 'pending')
+    assert calls == [False, False, True]
+
+
+def test_pool_changes_reach_other_processes(queue, monkeypatch):
+    proxies = bot._EgressPool('proxy')
+    proxies.add('http://env:1', 'env')
+    proxies.add('http://stale:1', 'manual')
+    queue.set_egress('proxy', 'http://new:1', 'manual')
+    queue.set_egress('proxy', 'http://env:1', 'manual', removed=True)
+    assert proxies.sync(queue.egress('proxy'))
+    assert list(proxies._entries) == ['http://new:1']
+    assert not proxies.sync(queue.egress('proxy'))
+
+    cookies = bot._EgressPool('cookies')
+    queue.replace_egress_source('cookies', 'runtime', ['a=1'])
+    cookies.sync(queue.egress('cookies'))
+    queue.replace_egress_source('cookies', 'runtime', ['b=2'])
+    cookies.sync(queue.egress('cookies'))
+    assert list(cookies._entries) == ['b=2']
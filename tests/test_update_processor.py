@@ -0,0 +1,53 @@
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot  # noqa: E402
+
+
+def _update(update_id, chat_id):
+    return SimpleNamespace(update_id=update_id, effective_chat=SimpleNamespace(id=chat_id))
+
+
+def _run_updates(processor, updates):
+    """Feed ``(update, seconds)`` pairs concurrently, in order; return {update_id: finish time}."""
+    finished = {}
+
+    async def handle(update, seconds, started):
+        await asyncio.sleep(seconds)
+        finished[update.update_id] = time.monotonic() - started
+
+    async def main():
+        started = time.monotonic()
+        tasks = []
+        for update, seconds in updates:
+            tasks.append(asyncio.create_task(processor.process_update(update, handle(update, seconds, started))))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    return finished
+
+
+def test_busy_chat_does_not_hold_global_slots():
+    processor = bot._ChatOrderedUpdateProcessor(2, 100)
+    finished = _run_updates(processor, [
+        (_update(1, 'A'), 0.5),
+        (_update(2, 'A'), 0.5),
+        (_update(3, 'A'), 0.5),
+        (_update(4, 'B'), 0.05),
+    ])
+    # B gets the second slot right away instead of queueing behind A2 and A3
+    assert finished[4] < 0.3
+    assert finished[1] < finished[2] < finished[3]
+
+
+def test_redelivered_update_is_dropped():
+    processor = bot._ChatOrderedUpdateProcessor(4, 100)
+    finished = _run_updates(processor, [(_update(1, 'A'), 0), (_update(1, 'A'), 0)])
+    assert list(finished) == [1]
+    assert not processor._chat_locks